@@ -12,6 +12,8 @@
 #
 # Required libraries:
 #   - json
+#   - math
+#   - time
 #   - SnmpUtility
 #       - From local module snmp_utilities - [https://github.com/rosskouk/python_snmp_utilities]
 #
@@ -22,6 +24,8 @@
 
 
 import json
+import math
+import time
 
 from submodules.python_snmp_utilities.snmp_utilities import SnmpUtility
 
@@ -32,10 +36,12 @@ class GetReadyNasStats(SnmpUtility):
     @details Get statistics from a Netgear ReadyNAS via SNMP
     """
 
-    def __init__(self, *args):
+    def __init__(self, *args, interval=None):
         """! @brief Constructor
 
         @param args LIST - Arguments to pass to the parent constructor, hostname and community string
+        @param interval INTEGER or FLOAT - Optional poll interval in seconds, timestamps are aligned to this interval
+        @exception ValueError Raised if interval is not a positive number of at least one nanosecond
         @details
 
         Passes the SNMP device hostname and community string to the parent constructor
@@ -43,6 +49,72 @@ class GetReadyNasStats(SnmpUtility):
 
         super().__init__(*args)
 
+        ## @var interval_ns
+        # @brief INTEGER - Poll interval in nanoseconds used to align timestamps, None disables alignment
+        self.interval_ns = None
+
+        if interval is not None:
+            # Validate the interval once so get_timestamp() can use it directly
+            if isinstance(interval, bool) or not isinstance(interval, (int, float)) \
+                    or not math.isfinite(interval) or interval <= 0:
+                raise ValueError(
+                    'Invalid interval {!r}, the interval must be a positive number of seconds '
+                    'e.g. 10 not 10s'.format(interval))
+
+            self.interval_ns = int(interval * 1000000000)
+
+            if self.interval_ns < 1:
+                raise ValueError(
+                    'Invalid interval {!r}, the interval must be at least one nanosecond'.format(interval))
+
+        ## @var device_name
+        # @brief STRING - The cached SNMP name of the device, None until first requested
+        self.device_name = None
+
+    def get_device_name(self):
+        """! @brief Get the SNMP name of the device
+
+        @return STRING - The SNMP name of the device
+        @details
+
+        The name is requested from the device the first time it is needed and cached,
+        this saves an SNMP round trip for every table gathered by the same instance.
+
+        The cached name is never refreshed, create a new instance if the device
+        may have been renamed.
+        """
+
+        if self.device_name is None:
+            self.device_name = self.get_snmp_name()['sysName']
+
+        return self.device_name
+
+    def get_timestamp(self):
+        """! @brief Get a timestamp for a set of measurements
+
+        @return INTEGER - The current time in nanoseconds since the epoch
+        @details
+
+        This method should be called as soon as an SNMP response has been received so
+        that the timestamp reflects when the data was collected rather than when the
+        exec plugin finished running.
+
+        If an interval has been set the timestamp is rounded down to the start of the
+        current interval, this keeps points from different devices and measurements
+        aligned.
+
+        Timestamps are returned in nanoseconds, Telegraf must be configured with
+        json_time_key = "timestamp" and json_time_format = "unix_ns"
+        """
+
+        timestamp = time.time_ns()
+
+        if self.interval_ns is not None:
+            # Align the timestamp to the start of the poll interval
+            timestamp -= timestamp % self.interval_ns
+
+        return timestamp
+
     def get_readynas_uptime(self):
         """! @brief Get the uptime from a Netgear ReadyNAS
 
@@ -53,13 +125,15 @@ class GetReadyNasStats(SnmpUtility):
         """
 
         measurement_list = []  # Blank list to hold dictionaries of measurements
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
         host_uptime = self.get_snmp_uptime()
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
         fields = {}
 
         # Store the hostname
-        fields['host'] = device_name['sysName']
+        fields['host'] = device_name
         fields['uptime'] = host_uptime['sysUpTimeInstance']
+        fields['timestamp'] = timestamp
 
         measurement_list.append(fields)  # Add to the measurement list
 
@@ -95,8 +169,9 @@ class GetReadyNasStats(SnmpUtility):
         ]
 
         disk_entries = self.bulkwalk(oids)
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
 
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
 
         for disk_entry in disk_entries:
             # Iterate over list of measurements
@@ -104,7 +179,8 @@ class GetReadyNasStats(SnmpUtility):
             fields = {}  # Define a blank dictionary to hold the fields
 
             # Store the hostname
-            fields['host'] = device_name['sysName']
+            fields['host'] = device_name
+            fields['timestamp'] = timestamp
 
             for key, value in disk_entry.items():
                 # Iterate over measurement fields
@@ -159,8 +235,9 @@ class GetReadyNasStats(SnmpUtility):
         ]
 
         fan_entries = self.bulkwalk(oids)
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
 
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
 
         for fan_entry in fan_entries.values():
             # Iterate over list of measurements
@@ -168,7 +245,8 @@ class GetReadyNasStats(SnmpUtility):
             fields = {}  # Define a blank dictionary to hold the fields
 
             # Store the hostname
-            fields['host'] = device_name['sysName']
+            fields['host'] = device_name
+            fields['timestamp'] = timestamp
 
             for key, value in fan_entry.items():
                 # Iterate over measurement fields
@@ -210,8 +288,9 @@ class GetReadyNasStats(SnmpUtility):
         measurement_list = []  # Blank list to hold dictionaries of measurements
 
         interface_entries = self.get_snmp_interfaces()
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
 
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
 
         for interface_entry in interface_entries:
             # Iterate over list of measurements
@@ -219,7 +298,8 @@ class GetReadyNasStats(SnmpUtility):
             fields = {}  # Define a blank dictionary to hold the fields
 
             # Store the hostname
-            fields['host'] = device_name['sysName']
+            fields['host'] = device_name
+            fields['timestamp'] = timestamp
 
             for key, value in interface_entry.items():
                 # Iterate over measurement fields
@@ -251,8 +331,9 @@ class GetReadyNasStats(SnmpUtility):
         ]
 
         temperature_entries = self.bulkwalk(oids)
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
 
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
 
         for temperature_entry in temperature_entries.values():
             # Iterate over list of measurements
@@ -260,7 +341,8 @@ class GetReadyNasStats(SnmpUtility):
             fields = {}  # Define a blank dictionary to hold the fields
 
             # Store the hostname
-            fields['host'] = device_name['sysName']
+            fields['host'] = device_name
+            fields['timestamp'] = timestamp
 
             for key, value in temperature_entry.items():
                 # Iterate over measurement fields
@@ -320,8 +402,9 @@ class GetReadyNasStats(SnmpUtility):
         ]
 
         volume_entries = self.bulkwalk(oids)
+        timestamp = self.get_timestamp()  # Record when the SNMP response arrived
 
-        device_name = self.get_snmp_name()
+        device_name = self.get_device_name()
 
         for volume_entry in volume_entries.values():
             # Iterate over list of measurements
@@ -331,7 +414,8 @@ class GetReadyNasStats(SnmpUtility):
             fields = {}  # Define a blank dictionary to hold the fields
 
             # Store the hostname
-            fields['host'] = device_name['sysName']
+            fields['host'] = device_name
+            fields['timestamp'] = timestamp
 
             for key, value in volume_entry.items():
                 # Iterate over measurement fields
@@ -16,6 +16,8 @@
 # Required libraries:
 #   - argparse
 #   - os
+#   - sys
+#   - tracemalloc
 #   - yaml
 #   - GetReadyNasStats
 #       - From local module get_readynas_stats
@@ -28,6 +30,17 @@
 
 import argparse
 import os
+import sys
+import tracemalloc
+
+for arg in sys.argv[1:]:
+    # Start tracing before the SNMP libraries are imported so they are included in the report,
+    # short options take no values so -m may be bundled with another option e.g. -dm
+    if arg == '--':
+        break
+    if arg == '--memory-report' or (arg.startswith('-') and not arg.startswith('--') and 'm' in arg):
+        tracemalloc.start()
+        break
 
 import yaml
 
@@ -75,13 +88,17 @@ readynas_host = cfg['readynas']['host']
 # @brief STRING - The SNMP community string of the ReadyNAS device
 readynas_snmp_community = cfg['readynas']['community']
 
+## @var telegraf_interval
+# @brief INTEGER or FLOAT - Optional poll interval in seconds used to align measurement timestamps
+telegraf_interval = (cfg.get('telegraf') or {}).get('interval')
+
 #
 # Parse CLI arguments
 #
 
 ## @var arg_parser
 # @brief OBJECT - An instance of ArgumentParser to process CLI options
-arg_parser = argparse.ArgumentParser(description='Get SNMP statistics from a Netgear ReadyNAS')
+arg_parser = argparse.ArgumentParser(description='Get SNMP statistics from a Netgear ReadyNAS', allow_abbrev=False)
 
 ## @var arg_group
 # @brief OBJECT - A mutually exclusive ArgumentParser group
@@ -98,17 +115,27 @@ arg_group.add_argument('-i', '--interfaces', action='store_true', dest='interfac
 arg_group.add_argument('-u', '--uptime', action='store_true', dest='uptime', help='get device uptime')
 # @endcond
 
+## @cond INTERNAL
+# Have Doxygen skip this line
+arg_parser.add_argument('-m', '--memory-report', action='store_true', dest='memory_report',
+                        help='print a tracemalloc memory report to stderr')
+# @endcond
+
 ## @var args
 # @brief OBJECT - An object containing the parsed CLI arguments
 # @details This group holds all CLI options and ensures that only one is chosen
 args = arg_parser.parse_args()
 
+if args.memory_report is True and not tracemalloc.is_tracing():
+    tracemalloc.start()  # Early start was missed, the report only covers gathering statistics
+
 
 #
 # Execute methods
 #
 
-stats = GetReadyNasStats(readynas_host, readynas_snmp_community, snmp_version)  # Create a new GetReadyNasStats object
+stats = GetReadyNasStats(readynas_host, readynas_snmp_community, snmp_version,
+                         interval=telegraf_interval)  # Create a new GetReadyNasStats object
 
 if args.disks is True:
     stats.process_readynas_disk_table()  # Get disk statistics
@@ -127,3 +154,15 @@ if args.interfaces is True:
 
 if args.uptime is True:
     stats.get_readynas_uptime()  # Get the device uptime
+
+if args.memory_report is True:
+    # Print the memory report to stderr so the JSON output is left intact
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('Traced Python allocations (not RSS): current {} KiB, peak {} KiB'.format(
+        current // 1024, peak // 1024), file=sys.stderr)
+
+    for stat in snapshot.statistics('lineno')[:10]:
+        print(stat, file=sys.stderr)